@@ -10,12 +10,39 @@ required — the /decide endpoint stays identical.
 
 import os
 import logging
+from dataclasses import dataclass
+from functools import lru_cache
+
+import orjson
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [dealer-ai] %(message)s')
 log = logging.getLogger(__name__)
 
+
+# Sorted keys, as Flask's default provider emits — response bodies stay stable
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson — C encoder/decoder, bytes in and out."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=_ORJSON_OPTIONS), mimetype="application/json"
+        )
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 
 RANK_VALUES = {
@@ -24,70 +51,94 @@ RANK_VALUES = {
 }
 
 
+@dataclass(slots=True, frozen=True)
+class Decision:
+    """/decide response. Field names are the wire format — orjson serializes it directly."""
+    action: str
+    handValue: int
+    isSoft: bool
+    reasoning: str
+
+
 def evaluate_hand(cards: list[dict]) -> tuple[int, bool]:
     """Pure function: returns (total, is_soft)."""
-    total = 0
-    aces = 0
-    for card in cards:
-        rank = card.get('rank', '0')
-        if rank == 'hidden':
-            continue
-        if rank == 'A':
-            aces += 1
-            total += 11
-        else:
-            total += RANK_VALUES.get(rank, 0)
-
-    soft = False
-    aces_used = 0
-    while total > 21 and aces_used < aces:
-        total -= 10
-        aces_used += 1
-
-    soft = aces_used < aces and total <= 21
+    rank_value = RANK_VALUES.get
+    # 'hidden' and unknown ranks are absent from RANK_VALUES and count 0.
+    # sum() and list.count() keep the per-card work inside C builtins.
+    values = [rank_value(card.get('rank'), 0) for card in cards]
+    total = sum(values)
+    aces = values.count(11)
+
+    # Demote just enough aces from 11 to 1 to get back to 21 or under
+    demoted = min(aces, (total - 12) // 10) if total > 21 else 0
+    total -= 10 * demoted
+
+    soft = demoted < aces and total <= 21
     return total, soft
 
 
-def dealer_decision(hand: list[dict]) -> dict:
+def dealer_decision(hand: list[dict]) -> Decision:
     """
     Standard casino dealer rules:
     - Stand on hard 17+
     - Hit on soft 17 (house rule — configurable in production)
     - Hit on 16 and below
     """
-    total, is_soft = evaluate_hand(hand)
+    return _decide(*evaluate_hand(hand))
 
+
+@lru_cache(maxsize=512)
+def _decide(total: int, is_soft: bool) -> Decision:
+    """
+    The rules only ever see (total, is_soft) — the hand itself is irrelevant,
+    so decisions are memoized on that pair (Decision is immutable, safe to share).
+    """
     if total > 21:
-        return {
-            "action": "bust",
-            "handValue": total,
-            "isSoft": is_soft,
-            "reasoning": f"Dealer busts with {total}"
-        }
+        return Decision(
+            action="bust",
+            handValue=total,
+            isSoft=is_soft,
+            reasoning=f"Dealer busts with {total}",
+        )
 
     if total < 17:
-        return {
-            "action": "hit",
-            "handValue": total,
-            "isSoft": is_soft,
-            "reasoning": f"Dealer hits on {total} (below 17)"
-        }
+        return Decision(
+            action="hit",
+            handValue=total,
+            isSoft=is_soft,
+            reasoning=f"Dealer hits on {total} (below 17)",
+        )
 
     if total == 17 and is_soft:
         # Soft 17 — house rules typically say hit
-        return {
-            "action": "hit",
-            "handValue": total,
-            "isSoft": True,
-            "reasoning": "Dealer hits soft 17 (house rule)"
-        }
+        return Decision(
+            action="hit",
+            handValue=total,
+            isSoft=True,
+            reasoning="Dealer hits soft 17 (house rule)",
+        )
+
+    return Decision(
+        action="stand",
+        handValue=total,
+        isSoft=is_soft,
+        reasoning=f"Dealer stands on {total}",
+    )
+
+
+# Response headers are identical for every request — build them once.
+_CORS_HEADERS = {'Access-Control-Allow-Origin': '*'}
+_PREFLIGHT_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+}
 
-    return {
-        "action": "stand",
-        "handValue": total,
-        "isSoft": is_soft,
-        "reasoning": f"Dealer stands on {total}"
-    }
+
+@lru_cache(maxsize=512)
+def _encoded_decision(total: int, is_soft: bool) -> bytes:
+    """Serialized /decide body. Only a few dozen (total, is_soft) pairs occur in play."""
+    return orjson.dumps(_decide(total, is_soft), option=_ORJSON_OPTIONS)
 
 
 @app.route('/health')
@@ -104,23 +155,24 @@ def health():
 def decide():
     if request.method == 'OPTIONS':
         resp = app.make_default_options_response()
-        resp.headers['Access-Control-Allow-Origin'] = '*'
-        resp.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
-        resp.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        resp.headers.update(_PREFLIGHT_HEADERS)
         return resp
 
-    data = request.get_json(silent=True)
+    data = request.get_json(silent=True, cache=False)
     if not data or 'hand' not in data:
         return jsonify({"error": "missing 'hand' in request body"}), 400
 
     hand = data['hand']
-    decision = dealer_decision(hand)
+    total, is_soft = evaluate_hand(hand)
+    decision = _decide(total, is_soft)
 
-    log.info(f"Decision for hand of {len(hand)} cards: {decision['action']} ({decision['reasoning']})")
+    log.info(f"Decision for hand of {len(hand)} cards: {decision.action} ({decision.reasoning})")
 
-    resp = jsonify(decision)
-    resp.headers['Access-Control-Allow-Origin'] = '*'
-    return resp
+    return app.response_class(
+        _encoded_decision(total, is_soft),
+        mimetype='application/json',
+        headers=_CORS_HEADERS,
+    )
 
 
 if __name__ == '__main__':
@@ -13,6 +13,8 @@ from dataclasses import dataclass
 
 log = logging.getLogger(__name__)
 
+_BAR = "=" * 60
+
 # Tiers in ascending privilege order
 TIER_LEVELS = {
     "system":       1,
@@ -35,12 +37,19 @@ CALLER_TIER_POLICY = {
 }
 
 # Which message types trigger security alerts regardless of auth outcome
-HONEYPOT_MESSAGE_TYPES = {
+HONEYPOT_MESSAGE_TYPES = frozenset({
     "password_reset",  # passkey-only system — no passwords to reset
+})
+
+# CALLER_TIER_POLICY compiled to one bitmask per caller (bit n = tier level n),
+# so a policy check is a shift-and-mask instead of a set lookup.
+_CALLER_MASKS = {
+    service: sum(1 << TIER_LEVELS[tier] for tier in tiers)
+    for service, tiers in CALLER_TIER_POLICY.items()
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class AuthRequest:
     calling_service: str
     request_id: str
@@ -49,7 +58,7 @@ class AuthRequest:
     recipient_user_id: str | None  # None for raw email recipients
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AuthResult:
     authorized: bool
     enforced_tier: str | None
@@ -64,15 +73,15 @@ def _call_opa(auth_req: AuthRequest) -> AuthResult:
     Production implementation calls Auth service /policy/check endpoint.
     Returns AuthResult based on OPA policy evaluation.
     """
-    log.info(f"STUB AUTH — would call Auth/OPA in production")
-    log.info(f"  caller       : {auth_req.calling_service}")
-    log.info(f"  tier         : {auth_req.tier}")
-    log.info(f"  message_type : {auth_req.message_type}")
-    log.info(f"  recipient    : {auth_req.recipient_user_id or '(raw email)'}")
+    log.info("STUB AUTH — would call Auth/OPA in production")
+    log.info("  caller       : %s", auth_req.calling_service)
+    log.info("  tier         : %s", auth_req.tier)
+    log.info("  message_type : %s", auth_req.message_type)
+    log.info("  recipient    : %s", auth_req.recipient_user_id or '(raw email)')
 
     # Stub applies documented policy so behavior is realistic
-    allowed_tiers = CALLER_TIER_POLICY.get(auth_req.calling_service, set())
-    if auth_req.tier not in allowed_tiers:
+    allowed_mask = _CALLER_MASKS.get(auth_req.calling_service, 0)
+    if not (allowed_mask >> TIER_LEVELS.get(auth_req.tier, 0)) & 1:
         return AuthResult(
             authorized=False,
             enforced_tier=None,
@@ -92,14 +101,14 @@ def check(auth_req: AuthRequest) -> AuthResult:
     # Honeypot check — runs even if auth passes
     # Logs security alert but does not reveal detection to caller
     if auth_req.message_type in HONEYPOT_MESSAGE_TYPES:
-        log.warning("=" * 60)
+        log.warning(_BAR)
         log.warning("SECURITY ALERT — honeypot message type triggered")
-        log.warning(f"  message_type    : {auth_req.message_type}")
-        log.warning(f"  calling_service : {auth_req.calling_service}")
-        log.warning(f"  request_id      : {auth_req.request_id}")
-        log.warning(f"  tier            : {auth_req.tier}")
+        log.warning("  message_type    : %s", auth_req.message_type)
+        log.warning("  calling_service : %s", auth_req.calling_service)
+        log.warning("  request_id      : %s", auth_req.request_id)
+        log.warning("  tier            : %s", auth_req.tier)
         log.warning("  Action: flag calling service for review")
-        log.warning("=" * 60)
+        log.warning(_BAR)
         # Caller sees normal rejection — no indication a wire was tripped
         return AuthResult(
             authorized=False,
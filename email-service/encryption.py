@@ -15,7 +15,10 @@ Key management assumption:
 
 import os
 import logging
-import urllib.request
+import threading
+import time
+import http.client
+import urllib.parse
 import json
 from dataclasses import dataclass
 
@@ -23,8 +26,26 @@ log = logging.getLogger(__name__)
 
 AUTH_SERVICE_URL = os.environ.get('AUTH_SERVICE_URL', 'http://auth-service:3006')
 
+# Recipient address cache — bursts of sends to the same user skip the auth-service
+# round trip. Failed lookups are cached briefly so a struggling auth-service
+# isn't hammered with retries.
+RESOLVE_CACHE_TTL     = float(os.environ.get('RESOLVE_CACHE_TTL', '300'))
+RESOLVE_NEGATIVE_TTL  = float(os.environ.get('RESOLVE_NEGATIVE_TTL', '10'))
+RESOLVE_CACHE_SIZE    = int(os.environ.get('RESOLVE_CACHE_SIZE', '10000'))
 
-@dataclass
+_resolve_cache: dict[str, tuple[float, str | None]] = {}  # user_id → (expires_at, email)
+_resolve_lock = threading.Lock()
+
+# One keep-alive connection to auth-service per worker thread, so cache misses
+# don't pay a TCP (and TLS) handshake each time.
+_AUTH_URL = urllib.parse.urlsplit(AUTH_SERVICE_URL)
+_AUTH_CONNECTION_CLASS = (
+    http.client.HTTPSConnection if _AUTH_URL.scheme == 'https' else http.client.HTTPConnection
+)
+_auth_local = threading.local()
+
+
+@dataclass(slots=True, frozen=True)
 class EncryptionResult:
     ciphertext: str      # Encrypted body (or plaintext if stub/waived)
     encrypted:  bool     # Whether actual encryption was applied
@@ -72,17 +93,60 @@ def resolve_recipient_address(user_id: str, tier: str) -> str | None:
     """
     Resolve a user_id to their registered email address.
     For Restricted tier, this is the only valid way to get a recipient address.
-    Calls auth-service — it owns the user registry.
+    Calls auth-service — it owns the user registry. Results are cached per
+    user_id (the address does not depend on tier).
     """
+    now = time.monotonic()
+    with _resolve_lock:
+        cached = _resolve_cache.get(user_id)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    email = _fetch_recipient_address(user_id, tier)
+    ttl = RESOLVE_CACHE_TTL if email else RESOLVE_NEGATIVE_TTL
+    with _resolve_lock:
+        if user_id not in _resolve_cache and len(_resolve_cache) >= RESOLVE_CACHE_SIZE:
+            # Evict the oldest entry (dicts keep insertion order)
+            del _resolve_cache[next(iter(_resolve_cache))]
+        _resolve_cache[user_id] = (now + ttl, email)
+    return email
+
+
+def _fetch_recipient_address(user_id: str, tier: str) -> str | None:
+    """GET {AUTH_SERVICE_URL}/users/{user_id}/email — None if unknown or unreachable."""
     try:
-        url = f"{AUTH_SERVICE_URL}/users/{user_id}/email"
-        req = urllib.request.Request(url, headers={'Accept': 'application/json'})
-        with urllib.request.urlopen(req, timeout=3) as resp:
-            data = json.loads(resp.read())
-            email = data.get('email')
-            if email:
-                log.info(f"Resolved user {user_id} → {email} (tier={tier})")
-                return email
+        status, data = _auth_get_json(f"{_AUTH_URL.path.rstrip('/')}/users/{user_id}/email")
+        if status != 200:
+            log.warning(f"Could not resolve email for user {user_id}: HTTP {status}")
+            return None
+        email = data.get('email')
+        if email:
+            log.info(f"Resolved user {user_id} → {email} (tier={tier})")
+            return email
     except Exception as e:
         log.warning(f"Could not resolve email for user {user_id}: {e}")
     return None
+
+
+def _auth_get_json(path: str) -> tuple[int, dict]:
+    """
+    GET a JSON document from auth-service over this thread's keep-alive connection.
+    A connection the server has closed while idle is reopened and retried once.
+    """
+    for attempt in (1, 2):
+        conn = getattr(_auth_local, 'conn', None)
+        if conn is None:
+            conn = _AUTH_CONNECTION_CLASS(_AUTH_URL.hostname, _AUTH_URL.port, timeout=3)
+            _auth_local.conn = conn
+        try:
+            conn.request('GET', path, headers={'Accept': 'application/json'})
+            resp = conn.getresponse()
+            body = resp.read()
+        except (http.client.HTTPException, OSError) as e:
+            conn.close()
+            _auth_local.conn = None
+            # Only a dropped connection is worth retrying — not a timeout
+            if attempt == 2 or not isinstance(e, ConnectionError):
+                raise
+            continue
+        return resp.status, json.loads(body) if resp.status == 200 else {}
@@ -4,7 +4,7 @@ Email Service
 Language  : Python
 Framework : Flask + Gunicorn
 
-Architecture: Four isolated layers behind a single /send endpoint.
+Architecture: Four isolated layers behind the /send and /send/batch endpoints.
   transport.py   — SMTP stub (swap for production, zero upstream changes)
   auth.py        — Auth/OPA stub (all policy decisions, never local)
   encryption.py  — Public-key encryption stub
@@ -15,8 +15,12 @@ See contracts.md for full API specification.
 """
 
 import os
+import hashlib
 import logging
+
+import orjson
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 
 import pipeline
 import templates
@@ -28,54 +32,155 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 
+
+# Sorted keys, as Flask's default provider emits — response bodies stay stable
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson — C encoder/decoder, bytes in and out."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=_ORJSON_OPTIONS), mimetype="application/json"
+        )
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+
+
+# Nothing in the health body changes after import — polled often, so encode it once
+_HEALTH_JSON = orjson.dumps({
+    "status": "healthy",
+    "service": "email-service",
+    "language": "Python",
+    "tiers": ["system", "social", "personal", "confidential", "restricted"],
+    "transport": dict(transport.smtp_config_summary()),
+    "encryption": "stubbed — logs intent, sends plaintext",
+    "auth": "stubbed — always authorized (policy enforced structurally)",
+}, option=_ORJSON_OPTIONS)
 
 
 @app.route('/health')
 def health():
-    smtp = transport.smtp_config_summary()
-    return jsonify({
-        "status": "healthy",
-        "service": "email-service",
-        "language": "Python",
-        "tiers": ["system", "social", "personal", "confidential", "restricted"],
-        "transport": smtp,
-        "encryption": "stubbed — logs intent, sends plaintext",
-        "auth": "stubbed — always authorized (policy enforced structurally)",
-    })
+    return app.response_class(_HEALTH_JSON, mimetype='application/json')
+
+
+# Upper bound on messages accepted by a single /send/batch call
+BATCH_MAX_MESSAGES = int(os.environ.get('BATCH_MAX_MESSAGES', '100'))
 
 
 @app.route('/send', methods=['POST'])
 def send():
-    data = request.get_json(silent=True)
-    if not data:
+    data = request.get_json(silent=True, cache=False)
+    if not isinstance(data, dict) or not data:
+        return jsonify(_schema_error_body("Request body must be JSON")), 400
+
+    parsed = _parse_send_request(data)
+    result = parsed if isinstance(parsed, pipeline.SendResult) else pipeline.process(parsed)
+    return jsonify(_result_body(result)), _status_code(result)
+
+
+@app.route('/send/batch', methods=['POST'])
+def send_batch():
+    data = request.get_json(silent=True, cache=False)
+    messages = data.get('messages') if isinstance(data, dict) else None
+    if not isinstance(messages, list) or not messages:
+        return jsonify(_schema_error_body("Request body must be JSON with a non-empty 'messages' array")), 400
+    if len(messages) > BATCH_MAX_MESSAGES:
+        return jsonify(_schema_error_body(f"Batch exceeds {BATCH_MAX_MESSAGES} messages")), 400
+
+    results: list[pipeline.SendResult | None] = []
+    pending: list[tuple[int, pipeline.SendRequest]] = []
+    for item in messages:
+        parsed = (_parse_send_request(item) if isinstance(item, dict)
+                  else _schema_rejection("Each message must be a JSON object"))
+        if isinstance(parsed, pipeline.SendResult):
+            results.append(parsed)
+        else:
+            pending.append((len(results), parsed))
+            results.append(None)
+
+    processed = pipeline.process_batch([req for _, req in pending])
+    for (index, _), result in zip(pending, processed):
+        results[index] = result
+
+    return jsonify({"results": [_result_body(r) for r in results]}), 200
+
+
+@app.route('/send/status/<message_id>', methods=['GET'])
+def send_status(message_id: str):
+    status = pipeline.delivery_status(message_id)
+    if status is None:
         return jsonify({
-            "status": "rejected",
-            "message_id": None,
-            "enforced_tier": None,
-            "encrypted": None,
-            "error": {"code": "invalid_schema", "message": "Request body must be JSON"}
-        }), 400
+            "message_id": message_id,
+            "status": "unknown",
+            "error": {"code": "not_found", "message": "No delivery record — message_id unknown or expired"},
+        }), 404
+    return jsonify({"message_id": message_id, **status})
+
 
+def _parse_send_request(data: dict) -> pipeline.SendRequest | pipeline.SendResult:
+    """Build a SendRequest from a /send body, or the rejection for a malformed envelope."""
     caller = data.get('caller', {})
     recipient = data.get('recipient', {})
     options = data.get('options', {})
-
-    req = pipeline.SendRequest(
-        calling_service=caller.get('service', ''),
-        request_id=caller.get('request_id', ''),
-        tier=data.get('tier', ''),
+    payload = data.get('payload', {})
+    for name, section in (('caller', caller), ('recipient', recipient), ('options', options), ('payload', payload)):
+        if not isinstance(section, dict):
+            return _schema_rejection(f"{name} must be a JSON object")
+
+    calling_service = caller.get('service', '')
+    request_id = caller.get('request_id', '')
+    tier = data.get('tier', '')
+    recipient_type = recipient.get('type', '')
+    recipient_value = recipient.get('value', '')
+
+    # Malformed envelopes are rejected before any pipeline objects are built
+    rejected = pipeline.check_schema(calling_service, request_id, tier, recipient_type, recipient_value)
+    if rejected:
+        return rejected
+
+    return pipeline.SendRequest(
+        calling_service=calling_service,
+        request_id=request_id,
+        tier=tier,
         message_type=data.get('message_type', ''),
-        recipient_type=recipient.get('type', ''),
-        recipient_value=recipient.get('value', ''),
-        payload=data.get('payload', {}),
+        recipient_type=recipient_type,
+        recipient_value=recipient_value,
+        payload=payload,
         encryption_waived=options.get('encryption_waived', False),
         waiver_token=options.get('waiver_token'),
     )
 
-    result = pipeline.process(req)
 
-    response_body = {
+def _schema_rejection(message: str) -> pipeline.SendResult:
+    return pipeline.SendResult(
+        status="rejected", message_id=None, enforced_tier=None, encrypted=None,
+        error_code="invalid_schema", error_message=message,
+    )
+
+
+def _schema_error_body(message: str) -> dict:
+    return {
+        "status": "rejected",
+        "message_id": None,
+        "enforced_tier": None,
+        "encrypted": None,
+        "error": {"code": "invalid_schema", "message": message}
+    }
+
+
+def _result_body(result: pipeline.SendResult) -> dict:
+    return {
         "status": result.status,
         "message_id": result.message_id,
         "enforced_tier": result.enforced_tier,
@@ -86,20 +191,32 @@ def send():
         } if result.error_code else None,
     }
 
-    status_code = 202 if result.status == "queued" else 400 if result.status == "rejected" else 500
-    return jsonify(response_body), status_code
+
+def _status_code(result: pipeline.SendResult) -> int:
+    if result.status == "queued":
+        return 202
+    if result.error_code == "smtp_unavailable":
+        return 503   # transport queue full — the request itself was fine
+    return 400 if result.status == "rejected" else 500
+
+
+# The registry is immutable after import — serialize it once; clients can revalidate
+_MESSAGE_TYPES_JSON = orjson.dumps({
+    name: {
+        "minimum_tier": spec.minimum_tier,
+        "required_fields": spec.required_fields,
+        "description": spec.description,
+    }
+    for name, spec in templates.MESSAGE_TYPES.items()
+}, option=_ORJSON_OPTIONS)
+_MESSAGE_TYPES_ETAG = hashlib.blake2b(_MESSAGE_TYPES_JSON, digest_size=8).hexdigest()
 
 
 @app.route('/message-types', methods=['GET'])
 def message_type_list():
-    return jsonify({
-        name: {
-            "minimum_tier": spec.minimum_tier,
-            "required_fields": spec.required_fields,
-            "description": spec.description,
-        }
-        for name, spec in templates.MESSAGE_TYPES.items()
-    })
+    resp = app.response_class(_MESSAGE_TYPES_JSON, mimetype='application/json')
+    resp.set_etag(_MESSAGE_TYPES_ETAG)
+    return resp.make_conditional(request)
 
 
 if __name__ == '__main__':
@@ -2,22 +2,29 @@
 pipeline.py — Email Processing Pipeline
 =========================================
 Executes the 9-step processing pipeline for every send request.
-Each step is a rejection point. Transport is the last step.
+Each step is a rejection point. Transport is the last step, and runs
+off the request thread: a send is "queued" once it is handed to the
+transport pool, and its delivery outcome is kept for delivery_status().
+At most TRANSPORT_QUEUE_LIMIT messages may be awaiting delivery; beyond
+that, sends are rejected with smtp_unavailable rather than piling up.
 
 Steps:
 1. Validate request schema
 2. Auth/OPA check
 3. Validate tier/recipient type compatibility
-4. Resolve recipient
-5. Validate payload against message type registry
-6. Render template
-7. Apply encryption if required
-8. Hand off to transport layer
-9. Return result
+4. Determine encryption (waiver token check)
+5. Resolve recipient
+6. Validate payload against message type registry
+7. Render template
+8. Apply encryption if required
+9. Hand off to transport layer (background pool)
 """
 
 import logging
-import uuid
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
 import auth
@@ -28,16 +35,34 @@ import transport
 log = logging.getLogger(__name__)
 
 # Tiers that require user_id recipient (no raw email addresses)
-REQUIRES_USER_ID = {"personal", "confidential", "restricted"}
+REQUIRES_USER_ID = frozenset({"personal", "confidential", "restricted"})
 
 # Tiers that require encryption
-REQUIRES_ENCRYPTION = {"confidential", "restricted"}
+REQUIRES_ENCRYPTION = frozenset({"confidential", "restricted"})
 
 # Tiers where encryption is always the default but can be waived by data owner
-ENCRYPTION_DEFAULT = {"personal"}
+ENCRYPTION_DEFAULT = frozenset({"personal"})
 
+RECIPIENT_TYPES = ("email", "user_id")
 
-@dataclass
+# Transport runs on a background pool so SMTP latency never holds a request
+TRANSPORT_WORKERS     = int(os.environ.get('TRANSPORT_WORKERS', '8'))
+TRANSPORT_QUEUE_LIMIT = max(1, int(os.environ.get('TRANSPORT_QUEUE_LIMIT', '1000')))
+DELIVERY_STATUS_SIZE  = int(os.environ.get('DELIVERY_STATUS_SIZE', '1024'))
+
+_TRANSPORT_POOL = ThreadPoolExecutor(max_workers=TRANSPORT_WORKERS, thread_name_prefix='transport')
+
+# One slot per message accepted but not yet delivered — backpressure when SMTP stalls
+_transport_slots = threading.BoundedSemaphore(TRANSPORT_QUEUE_LIMIT)
+
+# Messages awaiting delivery (never evicted), and the most recent finished
+# outcomes, oldest evicted first
+_pending_ids: set[str] = set()
+_delivery_status: OrderedDict[str, dict] = OrderedDict()
+_delivery_lock = threading.Lock()
+
+
+@dataclass(slots=True)
 class SendRequest:
     calling_service: str
     request_id: str
@@ -50,7 +75,7 @@ class SendRequest:
     waiver_token: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SendResult:
     status: str            # "queued" | "rejected" | "error"
     message_id: str | None
@@ -60,8 +85,64 @@ class SendResult:
     error_message: str | None = None
 
 
+@dataclass(slots=True, frozen=True)
+class ActionPlan:
+    """Tier-dependent outcome of steps 3 and 4 — fixed per (tier, recipient_type, waived)."""
+    reject: tuple[str, str] | None     # (code, message) from step 3, if the request can't proceed
+    should_encrypt: bool
+    needs_waiver_token: bool = False   # Waived personal tier — token checked in step 4
+
+
+def _plan(tier: str, recipient_type: str, waived: bool) -> ActionPlan:
+    if tier in REQUIRES_USER_ID and recipient_type != "user_id":
+        return ActionPlan(
+            reject=("invalid_recipient",
+                    f"{tier} tier requires registered user_id recipient, not raw email"),
+            should_encrypt=False,
+        )
+    if tier in REQUIRES_ENCRYPTION:
+        return ActionPlan(reject=None, should_encrypt=True)
+    if tier in ENCRYPTION_DEFAULT:
+        if waived:
+            return ActionPlan(reject=None, should_encrypt=False, needs_waiver_token=True)
+        return ActionPlan(reject=None, should_encrypt=True)
+    return ActionPlan(reject=None, should_encrypt=False)
+
+
+# Every tier × recipient type × waiver combination, decided once at import
+_PLANS: dict[tuple[str, str, bool], ActionPlan] = {
+    (tier, recipient_type, waived): _plan(tier, recipient_type, waived)
+    for tier in auth.TIER_LEVELS
+    for recipient_type in RECIPIENT_TYPES
+    for waived in (False, True)
+}
+
+
+# Message IDs are RFC 4122 v4 UUIDs cut from a per-thread entropy buffer:
+# one os.urandom() call per 256 messages instead of one per message.
+_ID_BUFFER_SIZE = 4096
+_id_local = threading.local()
+# A forked worker must never reuse entropy inherited from its parent
+os.register_at_fork(after_in_child=lambda: _id_local.__dict__.clear())
+
+
+def _new_message_id() -> str:
+    buf = getattr(_id_local, 'buf', None)
+    off = getattr(_id_local, 'off', _ID_BUFFER_SIZE)
+    if buf is None or off >= _ID_BUFFER_SIZE:
+        buf = _id_local.buf = os.urandom(_ID_BUFFER_SIZE)
+        off = 0
+    _id_local.off = off + 16
+
+    b = bytearray(buf[off:off + 16])
+    b[6] = (b[6] & 0x0f) | 0x40   # version 4
+    b[8] = (b[8] & 0x3f) | 0x80   # RFC 4122 variant
+    h = b.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
 def _reject(code: str, message: str, enforced_tier: str | None = None) -> SendResult:
-    log.warning(f"Request rejected [{code}]: {message}")
+    log.warning("Request rejected [%s]: %s", code, message)
     return SendResult(
         status="rejected",
         message_id=None,
@@ -72,23 +153,46 @@ def _reject(code: str, message: str, enforced_tier: str | None = None) -> SendRe
     )
 
 
-def process(req: SendRequest) -> SendResult:
-    message_id = str(uuid.uuid4())
-    log.info(f"[{message_id}] Processing {req.tier}/{req.message_type} from {req.calling_service}")
-
-    # ── Step 1: Validate request schema ──────────────────────────────────────
-    if not req.calling_service or not req.request_id:
+def check_schema(calling_service: str, request_id: str, tier: str,
+                 recipient_type: str, recipient_value: str) -> SendResult | None:
+    """
+    Step 1 on its own. Returns a rejection, or None if the envelope is well-formed.
+    The HTTP layer calls this before building a SendRequest so malformed bodies
+    are turned away cheaply.
+    """
+    if not calling_service or not request_id:
         return _reject("invalid_schema", "caller.service and caller.request_id are required")
 
-    if req.tier not in auth.TIER_LEVELS:
-        return _reject("invalid_schema", f"Unknown tier: {req.tier}")
+    if tier not in auth.TIER_LEVELS:
+        return _reject("invalid_schema", f"Unknown tier: {tier}")
 
-    if req.recipient_type not in ("email", "user_id"):
+    if recipient_type not in RECIPIENT_TYPES:
         return _reject("invalid_schema", f"recipient.type must be 'email' or 'user_id'")
 
-    if not req.recipient_value:
+    if not recipient_value:
         return _reject("invalid_schema", "recipient.value is required")
 
+    return None
+
+
+def process(req: SendRequest) -> SendResult:
+    prepared = _prepare(req)
+    if isinstance(prepared, SendResult):
+        return prepared
+    return _enqueue(prepared)
+
+
+def _prepare(req: SendRequest) -> SendResult | transport.TransportMessage:
+    """Steps 1-8. Returns the rejection, or the message ready for transport."""
+    message_id = _new_message_id()
+    log.info("[%s] Processing %s/%s from %s", message_id, req.tier, req.message_type, req.calling_service)
+
+    # ── Step 1: Validate request schema ──────────────────────────────────────
+    rejected = check_schema(req.calling_service, req.request_id, req.tier,
+                            req.recipient_type, req.recipient_value)
+    if rejected:
+        return rejected
+
     # ── Step 2: Auth/OPA check ────────────────────────────────────────────────
     auth_result = auth.check(auth.AuthRequest(
         calling_service=req.calling_service,
@@ -102,16 +206,28 @@ def process(req: SendRequest) -> SendResult:
         return _reject("auth_denied", auth_result.reason or "Authorization denied")
 
     enforced_tier = auth_result.enforced_tier
+    plan = _PLANS[(enforced_tier, req.recipient_type, bool(req.encryption_waived))]
 
     # ── Step 3: Validate tier/recipient compatibility ─────────────────────────
-    if enforced_tier in REQUIRES_USER_ID and req.recipient_type != "user_id":
-        return _reject(
-            "invalid_recipient",
-            f"{enforced_tier} tier requires registered user_id recipient, not raw email",
-            enforced_tier=enforced_tier,
-        )
-
-    # ── Step 4: Resolve recipient ─────────────────────────────────────────────
+    if plan.reject:
+        return _reject(*plan.reject, enforced_tier=enforced_tier)
+
+    # ── Step 4: Determine encryption ─────────────────────────────────────────
+    # Decided before resolving so an unencryptable request never costs a lookup
+    should_encrypt = plan.should_encrypt
+    if plan.needs_waiver_token:
+        # Validate waiver token
+        if not req.waiver_token:
+            return _reject("waiver_token_invalid",
+                "encryption_waived=true requires a waiver_token", enforced_tier)
+        # STUB: accept any non-empty token
+        log.info("STUB WAIVER — would validate re-verification token: %s", req.waiver_token)
+    # Every encrypting tier is in REQUIRES_USER_ID, so step 3 has already
+    # guaranteed a user_id to look the public key up by
+
+    # ── Step 5: Resolve recipient ─────────────────────────────────────────────
+    # Restricted tier only ever reaches here with a user_id (step 3), so the
+    # address always comes from the account registry — never from the caller.
     if req.recipient_type == "user_id":
         resolved_address = encryption.resolve_recipient_address(req.recipient_value, enforced_tier)
         if not resolved_address:
@@ -121,54 +237,27 @@ def process(req: SendRequest) -> SendResult:
         resolved_address = req.recipient_value
         recipient_user_id = None
 
-    # Restricted tier: ignore provided recipient entirely, use registered address only
-    if enforced_tier == "restricted":
-        registered_address = encryption.resolve_recipient_address(req.recipient_value, "restricted")
-        if not registered_address:
-            return _reject("recipient_not_found", f"No registered address on account for {req.recipient_value}", enforced_tier)
-        if resolved_address != registered_address:
-            return _reject("restricted_address_mismatch",
-                "Restricted tier: resolved address does not match account registered address", enforced_tier)
-        resolved_address = registered_address
-
-    # ── Step 5: Validate payload ──────────────────────────────────────────────
+    # ── Step 6: Validate payload ──────────────────────────────────────────────
+    if req.message_type not in templates.MESSAGE_TYPES:
+        return _reject("unknown_message_type", f"Unknown message type: {req.message_type}", enforced_tier)
+
     errors = templates.validate(req.message_type, enforced_tier, req.payload)
     if errors:
-        return _reject(
-            "payload_validation_failed" if "Unknown message type" not in errors[0] else "unknown_message_type",
-            "; ".join(errors),
-            enforced_tier=enforced_tier,
-        )
-
-    # ── Step 6: Determine encryption ─────────────────────────────────────────
-    should_encrypt: bool
-    if enforced_tier in REQUIRES_ENCRYPTION:
-        should_encrypt = True
-    elif enforced_tier in ENCRYPTION_DEFAULT:
-        if req.encryption_waived:
-            # Validate waiver token
-            if not req.waiver_token:
-                return _reject("waiver_token_invalid",
-                    "encryption_waived=true requires a waiver_token", enforced_tier)
-            # STUB: accept any non-empty token
-            log.info(f"STUB WAIVER — would validate re-verification token: {req.waiver_token}")
-            should_encrypt = False
-        else:
-            should_encrypt = True
-    else:
-        should_encrypt = False
+        return _reject("payload_validation_failed", "; ".join(errors), enforced_tier=enforced_tier)
 
     # ── Step 7: Render template ───────────────────────────────────────────────
-    subject, body, body_html = templates.render(req.message_type, req.payload, should_encrypt)
+    try:
+        subject, body, body_html = templates.render(req.message_type, req.payload, should_encrypt)
+    except templates.HoneypotRenderError as e:
+        # A honeypot type got past auth — refuse it the same way auth does
+        log.error("[%s] Render refused for %s: %s", message_id, req.message_type, e)
+        return _reject("auth_denied", "Message type not available")
 
     # ── Step 8: Apply encryption ──────────────────────────────────────────────
     final_body = body
     actually_encrypted = False
 
     if should_encrypt:
-        if not recipient_user_id:
-            return _reject("encryption_key_missing",
-                "Cannot encrypt: no user_id to look up public key", enforced_tier)
         enc_result = encryption.encrypt(body, recipient_user_id)
         if not enc_result.encrypted:
             return _reject("encryption_key_missing",
@@ -176,8 +265,7 @@ def process(req: SendRequest) -> SendResult:
         final_body = enc_result.ciphertext
         actually_encrypted = enc_result.encrypted
 
-    # ── Step 9: Hand off to transport ─────────────────────────────────────────
-    transport_result = transport.deliver(transport.TransportMessage(
+    return transport.TransportMessage(
         to_address=resolved_address,
         subject=subject,
         body_text=final_body,
@@ -185,23 +273,111 @@ def process(req: SendRequest) -> SendResult:
         message_id=message_id,
         encrypted=actually_encrypted,
         tier=enforced_tier,
-    ))
+    )
 
-    if not transport_result.success:
-        log.error(f"[{message_id}] Transport failed: {transport_result.error}")
-        return SendResult(
-            status="error",
-            message_id=message_id,
-            enforced_tier=enforced_tier,
-            encrypted=actually_encrypted,
-            error_code="smtp_unavailable",
-            error_message=transport_result.error,
-        )
 
-    log.info(f"[{message_id}] Queued successfully — tier={enforced_tier} encrypted={actually_encrypted}")
+def _enqueue(msg: transport.TransportMessage) -> SendResult:
+    # ── Step 9: Hand off to transport ─────────────────────────────────────────
+    if not _transport_slots.acquire(blocking=False):
+        return _queue_full(msg)
+    result = _mark_queued(msg)
+    _TRANSPORT_POOL.submit(_deliver, msg)
+    return result
+
+
+def _queue_full(msg: transport.TransportMessage) -> SendResult:
+    return _reject("smtp_unavailable",
+        f"Transport queue full ({TRANSPORT_QUEUE_LIMIT} pending) — retry later", msg.tier)
+
+
+def _mark_queued(msg: transport.TransportMessage) -> SendResult:
+    """Record a message as queued — before submission, so a fast delivery isn't overwritten."""
+    _record_delivery(msg.message_id, "queued")
+    log.info("[%s] Queued successfully — tier=%s encrypted=%s", msg.message_id, msg.tier, msg.encrypted)
     return SendResult(
         status="queued",
-        message_id=message_id,
-        enforced_tier=enforced_tier,
-        encrypted=actually_encrypted,
+        message_id=msg.message_id,
+        enforced_tier=msg.tier,
+        encrypted=msg.encrypted,
     )
+
+
+def _deliver(msg: transport.TransportMessage) -> None:
+    """Runs on the transport pool."""
+    try:
+        _record_outcome(msg, transport.deliver(msg))
+    finally:
+        _transport_slots.release()
+
+
+def _deliver_many(msgs: list[transport.TransportMessage]) -> None:
+    """Runs on the transport pool — one SMTP session for the whole batch."""
+    try:
+        try:
+            transport_results = transport.deliver_many(msgs)
+        except Exception as e:
+            # Nobody reads the pool's futures — record the failure or it stays "queued"
+            log.error("Batch transport error for %d messages starting %s: %s", len(msgs), msgs[0].message_id, e)
+            transport_results = [transport.TransportResult(success=False, error=str(e)) for _ in msgs]
+        for msg, transport_result in zip(msgs, transport_results):
+            _record_outcome(msg, transport_result)
+    finally:
+        for _ in msgs:
+            _transport_slots.release()
+
+
+def _record_outcome(msg: transport.TransportMessage, transport_result: transport.TransportResult) -> None:
+    if transport_result.success:
+        _record_delivery(msg.message_id, "delivered")
+    else:
+        log.error("[%s] Transport failed: %s", msg.message_id, transport_result.error)
+        _record_delivery(msg.message_id, "failed",
+                         {"code": "smtp_unavailable", "message": transport_result.error})
+
+
+def _record_delivery(message_id: str, status: str, error: dict | None = None) -> None:
+    with _delivery_lock:
+        if status == "queued":
+            _pending_ids.add(message_id)
+            return
+        _pending_ids.discard(message_id)
+        _delivery_status[message_id] = {"status": status, "error": error}
+        while len(_delivery_status) > DELIVERY_STATUS_SIZE:
+            _delivery_status.popitem(last=False)
+
+
+def delivery_status(message_id: str) -> dict | None:
+    """
+    Latest known outcome for a queued message: {"status": "queued" | "delivered"
+    | "failed", "error": {"code", "message"} | None}. Pending messages are always
+    reported; finished ones return None once evicted. None if never queued.
+    """
+    with _delivery_lock:
+        if message_id in _pending_ids:
+            return {"status": "queued", "error": None}
+        status = _delivery_status.get(message_id)
+        return dict(status) if status else None
+
+
+def process_batch(reqs: list[SendRequest]) -> list[SendResult]:
+    """
+    Process several sends from one caller request, results in request order.
+    Each message still gets its own auth check — the recipient is part of the
+    policy question. Repeat recipients resolve once via the address cache.
+    Everything that passes steps 1-8 and gets a transport slot goes to
+    transport as a single deliver_many() task, sharing one SMTP session.
+    """
+    results: list[SendResult] = []
+    msgs: list[transport.TransportMessage] = []
+    for prepared in (_prepare(req) for req in reqs):
+        # ── Step 9: Hand off to transport ─────────────────────────────────────
+        if isinstance(prepared, SendResult):
+            results.append(prepared)
+        elif not _transport_slots.acquire(blocking=False):
+            results.append(_queue_full(prepared))
+        else:
+            results.append(_mark_queued(prepared))
+            msgs.append(prepared)
+    if msgs:
+        _TRANSPORT_POOL.submit(_deliver_many, msgs)
+    return results
@@ -12,14 +12,33 @@ Adding a new message type: add entry to MESSAGE_TYPES and a render function.
 Nothing else needs to change.
 """
 
-from dataclasses import dataclass
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import lru_cache
 
 
-@dataclass
+class HoneypotRenderError(RuntimeError):
+    """A honeypot message type reached render() — auth should have stopped it."""
+
+
+TIER_LEVELS = {
+    "system": 1, "social": 2, "personal": 3, "confidential": 4, "restricted": 5
+}
+
+
+@dataclass(slots=True, frozen=True)
 class MessageTypeSpec:
     minimum_tier:    str
     required_fields: list[str]
     description:     str
+    # Payload fields that must parse with float(); validate() records the parsed
+    # values under _NUMERIC_KEY so renderers can compare without re-parsing
+    numeric_fields:  tuple[str, ...] = ()
+    # Integer form of minimum_tier, resolved once at registration
+    minimum_tier_level: int = field(init=False, default=0)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "minimum_tier_level", TIER_LEVELS.get(self.minimum_tier, 0))
 
 
 # ── Registry ──────────────────────────────────────────────────────────────────
@@ -56,6 +75,7 @@ MESSAGE_TYPES: dict[str, MessageTypeSpec] = {
         minimum_tier="social",
         required_fields=["result", "net_change"],
         description="Notification of game result to interested party",
+        numeric_fields=("net_change",),
     ),
 
     # Personal tier
@@ -63,6 +83,7 @@ MESSAGE_TYPES: dict[str, MessageTypeSpec] = {
         minimum_tier="personal",
         required_fields=["hands_played", "net_result", "session_start", "session_end"],
         description="Player's own session win/loss summary",
+        numeric_fields=("net_result",),
     ),
 
     # Confidential tier
@@ -80,63 +101,96 @@ MESSAGE_TYPES: dict[str, MessageTypeSpec] = {
     ),
 }
 
-TIER_LEVELS = {
-    "system": 1, "social": 2, "personal": 3, "confidential": 4, "restricted": 5
-}
-
 
 # ── Validation ────────────────────────────────────────────────────────────────
 
-def validate(message_type: str, tier: str, payload: dict) -> list[str]:
-    """Returns list of validation errors. Empty list = valid."""
-    errors = []
-    spec = MESSAGE_TYPES.get(message_type)
-    if not spec:
-        errors.append(f"Unknown message type: {message_type}")
+# Payload key validate() fills with {field: float} for the spec's numeric_fields.
+# The raw values stay as sent — some renderers show the caller's own text.
+_NUMERIC_KEY = "_numeric"
+
+
+def _compile_validator(message_type: str, spec: MessageTypeSpec) -> Callable[[str, dict], list[str]]:
+    """Bind one spec's tier floor and required fields into a dedicated validator."""
+    minimum_level = spec.minimum_tier_level
+    # Kept as an ordered tuple, not a frozenset — errors must list fields in spec order
+    required_fields = tuple(spec.required_fields)
+    numeric_fields = spec.numeric_fields
+    tier_error = (
+        f"Message type '{message_type}' requires minimum tier "
+        f"'{spec.minimum_tier}', got "
+    )
+
+    def validator(tier: str, payload: dict) -> list[str]:
+        errors = []
+        if TIER_LEVELS.get(tier, 0) < minimum_level:
+            errors.append(f"{tier_error}'{tier}'")
+        for name in required_fields:
+            if name not in payload or payload[name] is None:
+                errors.append(f"Missing required payload field: '{name}'")
+        if numeric_fields:
+            numbers = {}
+            for name in numeric_fields:
+                value = payload.get(name)
+                if value is None:
+                    continue
+                try:
+                    numbers[name] = float(value)
+                except (TypeError, ValueError, OverflowError):
+                    errors.append(f"Payload field '{name}' must be numeric")
+            payload[_NUMERIC_KEY] = numbers
         return errors
-    if TIER_LEVELS.get(tier, 0) < TIER_LEVELS.get(spec.minimum_tier, 0):
-        errors.append(
-            f"Message type '{message_type}' requires minimum tier "
-            f"'{spec.minimum_tier}', got '{tier}'"
-        )
-    for field in spec.required_fields:
-        if field not in payload or payload[field] is None:
-            errors.append(f"Missing required payload field: '{field}'")
-    return errors
+
+    return validator
+
+
+# One validator per registered type, built once at import
+_VALIDATORS: dict[str, Callable[[str, dict], list[str]]] = {
+    name: _compile_validator(name, spec) for name, spec in MESSAGE_TYPES.items()
+}
+
+
+def validate(message_type: str, tier: str, payload: dict) -> list[str]:
+    """
+    Returns list of validation errors. Empty list = valid.
+    Adds the parsed floats of the spec's numeric_fields to the payload under
+    _NUMERIC_KEY, leaving the raw values untouched; render() relies on it.
+    """
+    validator = _VALIDATORS.get(message_type)
+    if validator is None:
+        return [f"Unknown message type: {message_type}"]
+    return validator(tier, payload)
 
 
 # ── Renderers ─────────────────────────────────────────────────────────────────
 
+_ENC_NOTICE = "\n[This message is encrypted end-to-end]\n"
+
+
 def render(message_type: str, payload: dict, encrypted: bool) -> tuple[str, str, str | None]:
     """
     Returns (subject, body_text, body_html | None).
     body_html is None for most message types — only provided where HTML adds value.
     Raises KeyError if message_type not in registry (validate first).
+    Expects a payload already normalized by validate().
+    Raises HoneypotRenderError for honeypot types, which must never render.
     """
-    enc_notice = "\n[This message is encrypted end-to-end]\n" if encrypted else ""
-    renderers = {
-        "verify_email":        _render_verify_email,
-        "magic_link":          _render_magic_link,
-        "password_reset":      _render_password_reset,
-        "game_invite":         _render_game_invite,
-        "game_result_notify":  _render_game_result_notify,
-        "session_summary":     _render_session_summary,
-        "account_flag_notice": _render_account_flag_notice,
-        "transaction_receipt": _render_transaction_receipt,
-    }
-    subject, body_text, body_html = renderers[message_type](payload)
-    return subject, enc_notice + body_text, body_html
+    subject, body_text, body_html = _RENDERERS[message_type](payload)
+    if encrypted:
+        body_text = _ENC_NOTICE + body_text
+    return subject, body_text, body_html
 
 
 # ── HTML base template ────────────────────────────────────────────────────────
 
-def _html_wrap(title: str, body_inner: str) -> str:
-    return f"""<!DOCTYPE html>
+# Static markup around the two dynamic slots (title, body), built once at import.
+_HTML_HEAD = """<!DOCTYPE html>
 <html>
 <head>
   <meta charset="utf-8">
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <title>{title}</title>
+  <title>"""
+
+_HTML_BODY_OPEN = """</title>
 </head>
 <body style="margin:0;padding:0;background:#0d1117;font-family:'Segoe UI',system-ui,sans-serif;">
   <table width="100%" cellpadding="0" cellspacing="0" style="background:#0d1117;padding:40px 0;">
@@ -159,7 +213,9 @@ def _html_wrap(title: str, body_inner: str) -> str:
         <!-- Body -->
         <tr>
           <td style="padding:32px;">
-            {body_inner}
+            """
+
+_HTML_FOOT = """
           </td>
         </tr>
         <!-- Footer -->
@@ -178,6 +234,18 @@ def _html_wrap(title: str, body_inner: str) -> str:
 </html>"""
 
 
+@lru_cache(maxsize=32)
+def _html_skeleton(title: str) -> tuple[str, str]:
+    """Everything around the body for one title. Titles are fixed per message type."""
+    return f"{_HTML_HEAD}{title}{_HTML_BODY_OPEN}", _HTML_FOOT
+
+
+def _html_wrap(title: str, body_inner: str) -> str:
+    # Only the skeleton is cached — body_inner carries per-recipient URLs
+    head, foot = _html_skeleton(title)
+    return "".join((head, body_inner, foot))
+
+
 # ── Individual renderers ──────────────────────────────────────────────────────
 
 def _render_verify_email(p: dict) -> tuple[str, str, str | None]:
@@ -244,12 +312,8 @@ def _render_magic_link(p: dict) -> tuple[str, str, str | None]:
 
 
 def _render_password_reset(p: dict) -> tuple[str, str, str | None]:
-    return (
-        "Password reset",
-        "[STUB — this message type is a honeypot and should never render]\n\n"
-        f"{p.get('reset_url', '')}",
-        None,
-    )
+    # Honeypot — auth rejects it before rendering, so reaching here is a bug
+    raise HoneypotRenderError("password_reset is a honeypot and must not render")
 
 
 def _render_game_invite(p: dict) -> tuple[str, str, str | None]:
@@ -264,7 +328,7 @@ def _render_game_invite(p: dict) -> tuple[str, str, str | None]:
 def _render_game_result_notify(p: dict) -> tuple[str, str, str | None]:
     result = p['result'].upper()
     change = p['net_change']
-    sign = "+" if float(change) >= 0 else ""
+    sign = "+" if p[_NUMERIC_KEY]['net_change'] >= 0 else ""
     return (
         f"Game result: {result}",
         f"Your recent game has concluded.\n\nResult: {result}\nNet change: {sign}{change}\n\n"
@@ -274,7 +338,7 @@ def _render_game_result_notify(p: dict) -> tuple[str, str, str | None]:
 
 
 def _render_session_summary(p: dict) -> tuple[str, str, str | None]:
-    net = float(p['net_result'])
+    net = p[_NUMERIC_KEY]['net_result']
     sign = "+" if net >= 0 else ""
     return (
         "Your session summary",
@@ -311,3 +375,16 @@ def _render_transaction_receipt(p: dict) -> tuple[str, str, str | None]:
         f"If you did not authorize this transaction, contact support immediately.",
         None,
     )
+
+
+# Dispatch table for render() — defined after the renderers it references
+_RENDERERS: dict[str, Callable[[dict], tuple[str, str, str | None]]] = {
+    "verify_email":        _render_verify_email,
+    "magic_link":          _render_magic_link,
+    "password_reset":      _render_password_reset,
+    "game_invite":         _render_game_invite,
+    "game_result_notify":  _render_game_result_notify,
+    "session_summary":     _render_session_summary,
+    "account_flag_notice": _render_account_flag_notice,
+    "transaction_receipt": _render_transaction_receipt,
+}
@@ -11,17 +11,26 @@ Configuration (environment variables):
   SMTP_PASSWORD  — Password for SMTP auth (optional, leave empty for MailHog)
   SMTP_FROM      — From address (default: noreply@swarm-blackjack.local)
   SMTP_USE_TLS   — Use STARTTLS (default: false, set true for real SMTP)
+  SMTP_POOL_SIZE — Idle SMTP connections kept open for reuse (default: 8, 0 disables pooling)
+  SMTP_MAX_PER_CONNECTION — Messages sent on one session, across deliver() and
+                   deliver_many() calls, before it is retired (default: 100, minimum 1)
 
 For dev: SMTP_HOST=mailhog SMTP_PORT=1025, no auth, MailHog catches everything.
 For prod: point at real SMTP relay, set credentials.
 """
 
 import os
+import base64
+import queue
+import atexit
 import logging
 import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from collections.abc import Mapping
+from email import policy
+from email.header import Header
+from email.message import EmailMessage
 from dataclasses import dataclass
+from types import MappingProxyType
 
 log = logging.getLogger(__name__)
 
@@ -33,9 +42,21 @@ SMTP_USER    = os.environ.get('SMTP_USER', '')
 SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD', '')
 SMTP_FROM    = os.environ.get('SMTP_FROM', 'noreply@swarm-blackjack.local')
 SMTP_USE_TLS = os.environ.get('SMTP_USE_TLS', 'false').lower() == 'true'
+SMTP_POOL_SIZE = max(0, int(os.environ.get('SMTP_POOL_SIZE', '8')))
+SMTP_MAX_PER_CONNECTION = max(1, int(os.environ.get('SMTP_MAX_PER_CONNECTION', '100')))
 
+# Message-ID domain — fixed for the life of the process
+_MSGID_DOMAIN = SMTP_FROM.rsplit('@', 1)[-1] if '@' in SMTP_FROM else SMTP_FROM
 
-@dataclass
+# Header lines that never vary between messages
+_FROM_HEADER = f"From: {SMTP_FROM}\r\n"
+_PLAIN_TYPE_HEADERS = 'MIME-Version: 1.0\r\nContent-Type: text/plain; charset="utf-8"\r\n'
+
+# RFC 5322 folding with CRLF; 7bit so non-ASCII bodies get QP/base64, not raw 8bit
+_MIME_POLICY = policy.SMTP.clone(cte_type='7bit')
+
+
+@dataclass(slots=True, frozen=True)
 class TransportMessage:
     """Normalized message envelope. Transport layer speaks only this."""
     to_address: str
@@ -47,95 +68,306 @@ class TransportMessage:
     tier: str
 
 
-@dataclass
+@dataclass(slots=True)
 class TransportResult:
     success: bool
     error: str | None = None
 
 
-def _build_mime(msg: TransportMessage) -> MIMEMultipart:
-    """Build MIME message with text and optional HTML parts."""
-    mime = MIMEMultipart('alternative')
+def _build_mime(msg: TransportMessage) -> EmailMessage:
+    """
+    Build the message object: a single text part, or multipart/alternative
+    when there is an HTML version. Serialized by send_message() on the wire.
+    Raises ValueError if a header value contains a line break.
+    """
+    mime = EmailMessage(policy=_MIME_POLICY)
     mime['Subject'] = msg.subject
     mime['From']    = SMTP_FROM
     mime['To']      = msg.to_address
-    mime['Message-ID']  = f"<{msg.message_id}@{SMTP_FROM.split('@')[-1]}>"
+    mime['Message-ID']  = f"<{msg.message_id}@{_MSGID_DOMAIN}>"
     mime['X-Message-ID']    = msg.message_id
     mime['X-Swarm-Tier']    = msg.tier
-    mime['X-Swarm-Encrypted'] = str(msg.encrypted)
+    mime['X-Swarm-Encrypted'] = "True" if msg.encrypted else "False"
 
-    mime.attach(MIMEText(msg.body_text, 'plain', 'utf-8'))
+    mime.set_content(msg.body_text)
     if msg.body_html:
-        mime.attach(MIMEText(msg.body_html, 'html', 'utf-8'))
-
+        mime.add_alternative(msg.body_html, subtype='html')
     return mime
 
 
-def _smtp_send(msg: TransportMessage) -> TransportResult:
+def _build_plain_bytes(msg: TransportMessage) -> bytes | None:
+    """
+    Fast path for text-only messages: the RFC 5322 message assembled directly
+    as bytes, no email package objects. Returns None when a header needs more
+    care than this handles (embedded line breaks, non-ASCII address) —
+    callers fall back to _build_mime().
+    """
+    if any(c in v for v in (msg.subject, msg.to_address) for c in '\r\n') \
+            or not msg.to_address.isascii():
+        return None
+
+    subject = msg.subject if msg.subject.isascii() else Header(msg.subject, 'utf-8').encode(maxlinelen=0)
+
+    # Rendered bodies are already \n-only and short-lined; only rescan when they aren't
+    text = msg.body_text
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    if text.isascii() and (len(text) <= 998 or all(len(line) <= 998 for line in text.split('\n'))):
+        cte = '7bit'
+        body = text.replace('\n', '\r\n').encode('ascii')
+    else:
+        cte = 'base64'
+        body = base64.encodebytes(text.encode('utf-8')).replace(b'\n', b'\r\n')
+
+    head = (
+        f"Subject: {subject}\r\n"
+        f"{_FROM_HEADER}"
+        f"To: {msg.to_address}\r\n"
+        f"Message-ID: <{msg.message_id}@{_MSGID_DOMAIN}>\r\n"
+        f"X-Message-ID: {msg.message_id}\r\n"
+        f"X-Swarm-Tier: {msg.tier}\r\n"
+        f"X-Swarm-Encrypted: {'True' if msg.encrypted else 'False'}\r\n"
+        f"{_PLAIN_TYPE_HEADERS}"
+        f"Content-Transfer-Encoding: {cte}\r\n"
+        f"\r\n"
+    )
+    return head.encode('ascii') + body
+
+
+def _smtp_send(msgs: list[TransportMessage],
+               max_per_connection: int = SMTP_MAX_PER_CONNECTION) -> list[TransportResult]:
     """
-    Real SMTP delivery via smtplib.
+    Real SMTP delivery via smtplib. Messages go over one pooled session,
+    reconnecting if that session breaks. A session that has carried
+    max_per_connection messages (counted over its whole life, not just this
+    call) is QUIT and replaced rather than reused or returned to the pool.
     Falls back to console log if SMTP_HOST is not configured.
     """
     if not SMTP_HOST:
-        log.warning(f"[{msg.message_id}] SMTP_HOST not set — falling back to console output")
-        _console_fallback(msg)
-        return TransportResult(success=True)
+        for msg in msgs:
+            log.warning("[%s] SMTP_HOST not set — falling back to console output", msg.message_id)
+            _console_fallback(msg)
+        return [TransportResult(success=True) for _ in msgs]
+
+    results: list[TransportResult] = []
+    server: _Session | None = None
+    reused = False
+
+    for msg in msgs:
+        try:
+            payload = (_build_plain_bytes(msg) if not msg.body_html else None) or _build_mime(msg)
+        except ValueError as e:
+            log.error("Transport error for %s: %s", msg.message_id, e)
+            results.append(TransportResult(success=False, error=str(e)))
+            continue
+
+        if server is not None and server.sent >= max_per_connection:
+            _quit(server)
+            server = None
+
+        try:
+            if server is None:
+                server, reused = _acquire(msg.message_id, max_per_connection)
+            try:
+                _transmit(server, msg, payload)
+            except smtplib.SMTPServerDisconnected:
+                _discard(server)
+                server = None
+                if not reused:
+                    raise
+                # Relay dropped a session that had been idle or already used — retry once fresh
+                server = _connect(msg.message_id)
+                _transmit(server, msg, payload)
+            reused = True
+
+            log.info("[%s] Delivered: to=%s subject='%s' tier=%s encrypted=%s",
+                     msg.message_id, msg.to_address, msg.subject, msg.tier, msg.encrypted)
+            results.append(TransportResult(success=True))
+
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+            # Refused by the relay. sendmail() sends RSET and the session stays usable,
+            # except on 421, where smtplib has already closed it — reconnect next time
+            if getattr(e, 'smtp_code', None) == 421 or server.sock is None:
+                server = None
+            log.error("[%s] SMTP error: %s", msg.message_id, e)
+            results.append(TransportResult(success=False, error=f"SMTP error: {e}"))
+        except (smtplib.SMTPException, OSError) as e:
+            # Session is in an unknown state — drop it; the next message reconnects
+            if server is not None:
+                _discard(server)
+                server = None
+            if isinstance(e, smtplib.SMTPException):
+                log.error("[%s] SMTP error: %s", msg.message_id, e)
+                results.append(TransportResult(success=False, error=f"SMTP error: {e}"))
+            else:
+                log.error("[%s] Connection failed to %s:%s: %s", msg.message_id, SMTP_HOST, SMTP_PORT, e)
+                results.append(TransportResult(success=False, error=f"Connection failed: {e}"))
+
+    if server is not None:
+        _release(server, max_per_connection)
+    return results
+
+
+def _transmit(server: "_Session", msg: TransportMessage, payload: bytes | EmailMessage) -> None:
+    """Send prebuilt wire bytes as-is, or let send_message() flatten a message object."""
+    # Count the attempt, not the success — relays limit transactions per connection
+    server.sent += 1
+    if isinstance(payload, bytes):
+        server.sendmail(SMTP_FROM, [msg.to_address], payload)
+    else:
+        server.send_message(payload, from_addr=SMTP_FROM, to_addrs=[msg.to_address])
+
+
+# ── SMTP Connection Pool ──────────────────────────────────────────────────────
+# Idle sessions that have already done EHLO/STARTTLS/AUTH. LIFO so the most
+# recently used (least likely to have been timed out by the relay) goes first.
+# Any session that errors is closed and dropped rather than returned.
+
+class _Session(smtplib.SMTP):
+    """An SMTP session that counts the messages sent over it, for rotation."""
+    sent = 0
+
 
-    mime = _build_mime(msg)
+_pool: queue.LifoQueue[_Session] = queue.LifoQueue(maxsize=SMTP_POOL_SIZE)
 
+
+def _connect(message_id: str) -> _Session:
+    """Open a new SMTP session with STARTTLS and AUTH as configured."""
+    log.info("[%s] Connecting to SMTP %s:%s", message_id, SMTP_HOST, SMTP_PORT)
+    server = _Session(SMTP_HOST, SMTP_PORT, timeout=10)
     try:
-        log.info(f"[{msg.message_id}] Connecting to SMTP {SMTP_HOST}:{SMTP_PORT}")
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10) as server:
-            if SMTP_USE_TLS:
-                server.starttls()
-                log.info(f"[{msg.message_id}] STARTTLS enabled")
-            if SMTP_USER and SMTP_PASSWORD:
-                server.login(SMTP_USER, SMTP_PASSWORD)
-                log.info(f"[{msg.message_id}] Authenticated as {SMTP_USER}")
+        if SMTP_USE_TLS:
+            server.starttls()
+            log.info("[%s] STARTTLS enabled", message_id)
+        if SMTP_USER and SMTP_PASSWORD:
+            server.login(SMTP_USER, SMTP_PASSWORD)
+            log.info("[%s] Authenticated as %s", message_id, SMTP_USER)
+    except BaseException:
+        _discard(server)
+        raise
+    return server
+
 
-            server.sendmail(SMTP_FROM, [msg.to_address], mime.as_string())
+def _acquire(message_id: str,
+             max_per_connection: int = SMTP_MAX_PER_CONNECTION) -> tuple[_Session, bool]:
+    """
+    Take a live session from the pool, or open a new one.
+    Returns (server, reused). Pooled sessions must answer NOOP before reuse;
+    those already at max_per_connection are retired instead.
+    """
+    while True:
+        try:
+            server = _pool.get_nowait()
+        except queue.Empty:
+            return _connect(message_id), False
+        if server.sent >= max_per_connection:
+            _quit(server)
+            continue
+        try:
+            if server.noop()[0] == 250:
+                return server, True
+        except (smtplib.SMTPException, OSError):
+            pass
+        _discard(server)
 
-        log.info(f"[{msg.message_id}] Delivered: to={msg.to_address} subject='{msg.subject}' "
-                 f"tier={msg.tier} encrypted={msg.encrypted}")
-        return TransportResult(success=True)
 
-    except smtplib.SMTPException as e:
-        log.error(f"[{msg.message_id}] SMTP error: {e}")
-        return TransportResult(success=False, error=f"SMTP error: {e}")
-    except OSError as e:
-        log.error(f"[{msg.message_id}] Connection failed to {SMTP_HOST}:{SMTP_PORT}: {e}")
-        return TransportResult(success=False, error=f"Connection failed: {e}")
+def _release(server: _Session, max_per_connection: int = SMTP_MAX_PER_CONNECTION) -> None:
+    """
+    Return a healthy session to the pool; quit it if it has used up its
+    max_per_connection budget, or the pool is full or disabled.
+    """
+    if not SMTP_POOL_SIZE or server.sent >= max_per_connection:
+        # LifoQueue(maxsize=0) would be unbounded — 0 means no pooling at all
+        _quit(server)
+        return
+    try:
+        _pool.put_nowait(server)
+    except queue.Full:
+        _quit(server)
+
+
+def _discard(server: smtplib.SMTP) -> None:
+    """Drop a session without the QUIT round trip — it may already be dead."""
+    try:
+        server.close()
+    except OSError:
+        pass
+
+
+def _quit(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        _discard(server)
+
+
+def shutdown_pool() -> None:
+    """QUIT every idle pooled session. Registered to run at interpreter exit."""
+    while True:
+        try:
+            server = _pool.get_nowait()
+        except queue.Empty:
+            return
+        _quit(server)
+
+
+atexit.register(shutdown_pool)
 
 
 def _console_fallback(msg: TransportMessage) -> None:
     """Last-resort logging when SMTP is unavailable."""
     log.info("=" * 60)
     log.info("EMAIL (console fallback — no SMTP configured)")
-    log.info(f"  message_id : {msg.message_id}")
-    log.info(f"  tier       : {msg.tier}")
-    log.info(f"  encrypted  : {msg.encrypted}")
-    log.info(f"  to         : {msg.to_address}")
-    log.info(f"  subject    : {msg.subject}")
-    log.info(f"  body       : {msg.body_text[:300]}{'...' if len(msg.body_text) > 300 else ''}")
+    log.info("  message_id : %s", msg.message_id)
+    log.info("  tier       : %s", msg.tier)
+    log.info("  encrypted  : %s", msg.encrypted)
+    log.info("  to         : %s", msg.to_address)
+    log.info("  subject    : %s", msg.subject)
+    log.info("  body       : %s%s", msg.body_text[:300], '...' if len(msg.body_text) > 300 else '')
     log.info("=" * 60)
 
 
 def deliver(msg: TransportMessage) -> TransportResult:
     """Public interface. Pipeline calls this — never calls _smtp_send directly."""
     try:
-        return _smtp_send(msg)
+        return _smtp_send([msg])[0]
     except Exception as e:
-        log.error(f"Transport error for {msg.message_id}: {e}")
+        log.error("Transport error for %s: %s", msg.message_id, e)
         return TransportResult(success=False, error=str(e))
 
 
-def smtp_config_summary() -> dict:
-    """Return current SMTP config for health endpoint."""
-    return {
-        "host":    SMTP_HOST or "(not set — console fallback)",
-        "port":    SMTP_PORT,
-        "from":    SMTP_FROM,
-        "auth":    bool(SMTP_USER),
-        "tls":     SMTP_USE_TLS,
-        "mode":    "mailhog" if SMTP_HOST == "mailhog" else ("smtp" if SMTP_HOST else "console"),
-    }
+def deliver_many(msgs: list[TransportMessage],
+                 max_per_connection: int = SMTP_MAX_PER_CONNECTION) -> list[TransportResult]:
+    """
+    Public interface for several messages at once, results in input order.
+    Messages share SMTP sessions, and a session is retired once it has carried
+    max_per_connection messages in total, so relays with per-connection limits
+    are respected. Callers with more than one message to send should prefer
+    this over repeated deliver().
+    Raises ValueError if max_per_connection is below 1.
+    """
+    if max_per_connection < 1:
+        raise ValueError(f"max_per_connection must be at least 1, got {max_per_connection}")
+    if not msgs:
+        return []
+    try:
+        return _smtp_send(msgs, max_per_connection)
+    except Exception as e:
+        log.error("Transport error for batch starting %s: %s", msgs[0].message_id, e)
+        return [TransportResult(success=False, error=str(e)) for _ in msgs]
+
+
+# SMTP config never changes after import — build the health summary once
+_CONFIG_SUMMARY = MappingProxyType({
+    "host":    SMTP_HOST or "(not set — console fallback)",
+    "port":    SMTP_PORT,
+    "from":    SMTP_FROM,
+    "auth":    bool(SMTP_USER),
+    "tls":     SMTP_USE_TLS,
+    "mode":    "mailhog" if SMTP_HOST == "mailhog" else ("smtp" if SMTP_HOST else "console"),
+})
+
+
+def smtp_config_summary() -> Mapping[str, object]:
+    """Return current SMTP config for health endpoint. Read-only; copy to modify."""
+    return _CONFIG_SUMMARY